@@ -4,18 +4,26 @@ import httpx
 
 REFINERY_URL = "http://localhost:8787"
 
-async def get_alpha_forecast(signal_id, processed_json):
+# Forecasts run concurrently but capped, so the real Graphiti/Vectorize/
+# Gemini backends never see more than this many in-flight requests.
+FORECAST_CONCURRENCY = 5
+
+async def get_alpha_forecast(client, sem, signal_id, processed_json):
     """
     Synthesize predictive intelligence by bridging Graphiti and Vectorize.
     (Mock implementation showing the integration flow)
     """
+    async with sem:
+        return await _compute_forecast(client, signal_id, processed_json)
+
+async def _compute_forecast(client, signal_id, processed_json):
     print(f"--- Computing Alpha for Signal {signal_id} ---")
-    
-    # In a real implementation, we would:
+
+    # In a real implementation, we would (all over the shared client):
     # 1. Query Graphiti for relational impacts.
     # 2. Query Vectorize for historical precedents.
     # 3. Use Gemini to synthesize the forecast.
-    
+
     forecast = {
         "signal_id": signal_id,
         "forecast": {
@@ -43,10 +51,16 @@ async def main():
             })
             response.raise_for_status()
             items = response.json().get("result", [])
-            
-            for item in items:
-                await get_alpha_forecast(item["id"], item["processed_json"])
-                
+
+            sem = asyncio.Semaphore(FORECAST_CONCURRENCY)
+            results = await asyncio.gather(
+                *(get_alpha_forecast(client, sem, item["id"], item["processed_json"]) for item in items),
+                return_exceptions=True
+            )
+            for item, result in zip(items, results):
+                if isinstance(result, Exception):
+                    print(f"Forecast failed for signal {item['id']}: {result}")
+
         except Exception as e:
             print(f"Alpha Engine Error: {e}")
 
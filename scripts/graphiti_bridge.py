@@ -1,8 +1,18 @@
 import asyncio
+import hashlib
 import json
 import os
+import random
+import sqlite3
+import time
 import httpx
 from mcp import ClientSession, StdioServerParameters
+
+try:
+    import orjson
+    json_loads = orjson.loads  # C parser, ~2-3x faster on big analysis blobs
+except ImportError:
+    json_loads = json.loads
 from mcp.client.stdio import stdio_client
 
 # Configuration
@@ -10,90 +20,227 @@ REFINERY_URL = "http://localhost:8787"
 GRAPHITI_VENV_PYTHON = "/Users/brixelectronics/Documents/mac/criticalinsight_repos/gemini-graphiti-mcp/venv/bin/python"
 GRAPHITI_MODULE = "graphiti_mcp.server"
 
-async def sync_to_graphiti():
-    print("--- Starting Graphiti Sync Bridge ---")
-    
-    # 1. Fetch unsynced items from ContentDO
-    async with httpx.AsyncClient() as client:
+# Daemon tuning: the MCP subprocess (Neo4j connect + model warmup) is
+# started once and reused across polls; the bounded queue gives natural
+# backpressure between the refinery fetch and the Graphiti push.
+POLL_INTERVAL = int(os.environ.get("BRIDGE_POLL_SECONDS", "60"))
+QUEUE_SIZE = 256
+PAGE_SIZE = 256
+WORKER_COUNT = 4
+MCP_CONCURRENCY = 8
+
+DEDUP_DB = ".bridge_dedup.db"
+DEDUP_TTL = 7 * 24 * 3600
+
+class EpisodeDeduper:
+    """
+    Skips episode bodies already pushed to the graph. Hashes live in
+    memory for the run and in a small sqlite file with a 7-day TTL so
+    repeated relationships (e.g. the same ticker link every sync) do not
+    re-hit Graphiti across invocations.
+    """
+
+    def __init__(self, path=DEDUP_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen (hash BLOB PRIMARY KEY, created_at INTEGER)")
+        self.conn.execute("DELETE FROM seen WHERE created_at < ?", (int(time.time()) - DEDUP_TTL,))
+        self.conn.commit()
+        self.seen = {row[0] for row in self.conn.execute("SELECT hash FROM seen")}
+
+    def filter_new(self, contents):
+        """Return (hash, content) pairs not yet pushed. Nothing is marked
+        seen here: record() only runs after the push succeeds, so a
+        failed item is retried with its full episode set next pass."""
+        fresh = []
+        batch = set()
+        for content in contents:
+            h = hashlib.blake2b(content.encode(), digest_size=16).digest()
+            if h in self.seen or h in batch:
+                continue
+            batch.add(h)
+            fresh.append((h, content))
+        return fresh
+
+    def record(self, hashes):
+        now = int(time.time())
+        for h in hashes:
+            self.seen.add(h)
+            self.conn.execute("INSERT OR IGNORE INTO seen (hash, created_at) VALUES (?, ?)", (h, now))
+        self.conn.commit()
+
+async def fetch_page(client, cursor):
+    try:
+        params = {"limit": PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/knowledge/sync", params=params)
+        response.raise_for_status()
+        data = response.json()
+        # Servers without pagination return everything and no cursor.
+        return data.get("items", []), data.get("next")
+    except Exception as e:
+        print(f"Failed to fetch items from refinery: {e}")
+        return [], None
+
+async def producer(client, queue):
+    """Page through /knowledge/sync, feeding the bounded queue; the put
+    blocks when workers lag, so memory stays capped at QUEUE_SIZE items
+    no matter how deep the backlog is."""
+    total = 0
+    cursor = None
+    while True:
+        items, cursor = await fetch_page(client, cursor)
+        for item in items:
+            await queue.put(item)
+        total += len(items)
+        if not cursor:
+            break
+    for _ in range(WORKER_COUNT):
+        await queue.put(None)
+    return total
+
+async def mark_synced(client, synced_ids):
+    try:
+        res = await client.post("/knowledge/mark-synced", json={"ids": synced_ids})
+        res.raise_for_status()
+        print(f"Marked {len(synced_ids)} items as synced in refinery.")
+    except Exception as e:
+        print(f"Failed to mark items as synced: {e}")
+
+async def with_retry(coro_factory, *, retries=3, timeout=10):
+    """
+    Retry transient MCP failures (Neo4j/embedding stalls) with capped
+    per-attempt latency and jittered exponential backoff.
+    """
+    for attempt in range(retries):
         try:
-            response = await client.get(f"{REFINERY_URL}/knowledge/sync")
-            response.raise_for_status()
-            data = response.json()
-            items = data.get("items", [])
-            if not items:
-                print("No new items to sync.")
+            return await asyncio.wait_for(coro_factory(), timeout)
+        except (TimeoutError, asyncio.TimeoutError, ConnectionError, OSError) as e:
+            if attempt == retries - 1:
+                raise
+            delay = 0.5 * (2 ** attempt) + random.random() * 0.1
+            print(f"Transient MCP error ({e!r}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def build_episodes(item):
+    """Flatten one refinery item into its episode bodies."""
+    # processed_json might be a string in SQLite
+    raw_json = item["processed_json"]
+    processed = json_loads(raw_json) if isinstance(raw_json, (str, bytes)) else raw_json
+
+    # Extract the analysis (Gemini output)
+    analysis = processed.get("analysis", [])
+    if not isinstance(analysis, list):
+        analysis = [analysis]
+
+    episodes = []
+    for entry in analysis:
+        summary = entry.get("summary", "No summary")
+        relationships = entry.get("relationships", [])
+
+        # The main fact
+        episodes.append(f"MARKET SIGNAL: {summary}. Detail: {entry.get('detail', '')}")
+
+        # Specific relationships if available
+        for rel in relationships:
+            target = rel.get("target")
+            rel_type = rel.get("type")
+            desc = rel.get("description", "")
+            if target and rel_type:
+                episodes.append(f"RELATIONSHIP: {summary} {rel_type} {target}. Context: {desc}")
+    return episodes
+
+async def process_item(session, sem, item, batch_tool, deduper):
+    """Push all episodes for one refinery item in a single MCP round-trip."""
+    fresh = deduper.filter_new(build_episodes(item))
+    if not fresh:
+        return
+    episodes = [content for _, content in fresh]
+
+    async with sem:
+        if batch_tool:
+            await with_retry(lambda: session.call_tool(
+                "mcp_graphiti-mcp_add_episodes_batch",
+                arguments={"contents": episodes, "group_id": "market_signals"}
+            ))
+        else:
+            # Server without the batch tool: coalesce into one episode body.
+            await with_retry(lambda: session.call_tool(
+                "mcp_graphiti-mcp_add_episode",
+                arguments={"content": "\n---\n".join(episodes), "group_id": "market_signals"}
+            ))
+
+    # Only now are the bodies known to be in the graph.
+    deduper.record([h for h, _ in fresh])
+
+async def worker(queue, session, sem, synced_ids, lock, batch_tool, deduper):
+    while True:
+        item = await queue.get()
+        try:
+            if item is None:
                 return
-            print(f"Found {len(items)} items to sync.")
-        except Exception as e:
-            print(f"Failed to fetch items from refinery: {e}")
-            return
+            try:
+                await process_item(session, sem, item, batch_tool, deduper)
+                async with lock:
+                    synced_ids.append(item["id"])
+                print(f"Successfully synced item {item['id']}")
+            except Exception as e:
+                print(f"Error processing item {item['id']}: {e}")
+        finally:
+            queue.task_done()
+
+async def sync_to_graphiti(client, session, sem, queue, batch_tool, deduper):
+    """One sync pass: stream unsynced items through the queue, push them,
+    mark them synced."""
+    synced_ids = []
+    lock = asyncio.Lock()
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(WORKER_COUNT):
+            tg.create_task(worker(queue, session, sem, synced_ids, lock, batch_tool, deduper))
+        fetch_task = tg.create_task(producer(client, queue))
+
+    total = fetch_task.result()
+    if not total:
+        print("No new items to sync.")
+        return
+    print(f"Processed {total} items this pass.")
+
+    if synced_ids:
+        await mark_synced(client, synced_ids)
+
+async def daemon():
+    print("--- Starting Graphiti Sync Bridge (daemon mode) ---")
 
-    # 2. Connect to Graphiti MCP
     server_params = StdioServerParameters(
         command=GRAPHITI_VENV_PYTHON,
         args=["-m", GRAPHITI_MODULE],
         env={**os.environ, "MCP_SERVER_NAME": "graphiti-mcp"}
     )
 
-    synced_ids = []
     try:
-        async with stdio_client(server_params) as (read, write):
+        # One client for the daemon's lifetime: the sync fetch and
+        # mark-synced calls share a single kept-alive connection. (No
+        # http2=True: it needs the httpx[http2] extra and the cleartext
+        # refinery endpoint never negotiates h2 anyway.)
+        async with httpx.AsyncClient(base_url=REFINERY_URL) as client, \
+                stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
                 print("Connected to Graphiti Knowledge Graph.")
 
-                for item in items:
-                    item_id = item["id"]
-                    try:
-                        # processed_json might be a string in SQLite
-                        raw_json = item["processed_json"]
-                        processed = json.loads(raw_json) if isinstance(raw_json, str) else raw_json
-                        
-                        # Extract the analysis (Gemini output)
-                        analysis = processed.get("analysis", [])
-                        if not isinstance(analysis, list):
-                            analysis = [analysis]
-
-                        for entry in analysis:
-                            summary = entry.get("summary", "No summary")
-                            relationships = entry.get("relationships", [])
-                            
-                            # Add the main fact
-                            fact_content = f"MARKET SIGNAL: {summary}. Detail: {entry.get('detail', '')}"
-                            await session.call_tool(
-                                "mcp_graphiti-mcp_add_episode",
-                                arguments={"content": fact_content, "group_id": "market_signals"}
-                            )
-                            
-                            # Add specific relationships if available
-                            for rel in relationships:
-                                target = rel.get("target")
-                                rel_type = rel.get("type")
-                                desc = rel.get("description", "")
-                                if target and rel_type:
-                                    rel_fact = f"RELATIONSHIP: {summary} {rel_type} {target}. Context: {desc}"
-                                    await session.call_tool(
-                                        "mcp_graphiti-mcp_add_episode",
-                                        arguments={"content": rel_fact, "group_id": "market_signals"}
-                                    )
-                        
-                        synced_ids.append(item_id)
-                        print(f"Successfully synced item {item_id}")
-                    except Exception as e:
-                        print(f"Error processing item {item_id}: {e}")
+                tools = await session.list_tools()
+                batch_tool = any(t.name == "mcp_graphiti-mcp_add_episodes_batch" for t in tools.tools)
+                if not batch_tool:
+                    print("Server lacks add_episodes_batch; coalescing episodes per item.")
 
+                sem = asyncio.Semaphore(MCP_CONCURRENCY)
+                queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+                deduper = EpisodeDeduper()
+                while True:
+                    await sync_to_graphiti(client, session, sem, queue, batch_tool, deduper)
+                    await asyncio.sleep(POLL_INTERVAL)
     except Exception as e:
         print(f"Graphiti MCP communication error: {e}")
 
-    # 3. Mark items as synced in ContentDO
-    if synced_ids:
-        async with httpx.AsyncClient() as client:
-            try:
-                res = await client.post(f"{REFINERY_URL}/knowledge/mark-synced", json={"ids": synced_ids})
-                res.raise_for_status()
-                print(f"Marked {len(synced_ids)} items as synced in refinery.")
-            except Exception as e:
-                print(f"Failed to mark items as synced: {e}")
-
 if __name__ == "__main__":
-    asyncio.run(sync_to_graphiti())
+    asyncio.run(daemon())
@@ -1,11 +1,18 @@
-import requests
-import json
-import uuid
-import time
+import asyncio
+import httpx
 
-URL = "http://localhost:8787/ingest"
+URL = "http://localhost:8787"
 
-def ingest_mock(chat_id, title, text, source_type="telegram"):
+MOCKS = [
+    # Telegram Mock
+    ("tg_123", "Whale Alert", "$BTC breakdown below 40k imminent. Selling pressure from Mt. Gox wallets confirmed.", "telegram"),
+    # Twitter Mock
+    ("tw_finviz", "Finviz Insider", "URGENT: $AAPL supply chain issues in China reported by Nikkei. Expecting 5% downside.", "twitter"),
+    # RSS Mock
+    ("rss_reuters", "Reuters Business", "Fed maintains interest rates, signals no cuts until late 2026. Bullish for USD.", "rss"),
+]
+
+async def ingest_mock(client, chat_id, title, text, source_type="telegram"):
     payload = {
         "chatId": chat_id,
         "title": title,
@@ -16,22 +23,22 @@ def ingest_mock(chat_id, title, text, source_type="telegram"):
         }
     }
     try:
-        response = requests.post(URL, json=payload)
+        response = await client.post("/ingest", json=payload)
         print(f"[{source_type.upper()}] Ingested: {title} | Status: {response.status_code}")
         return response.json()
     except Exception as e:
         print(f"Failed to ingest: {e}")
 
-if __name__ == "__main__":
+async def main():
     print("--- Starting Multi-Source Ingestion Simulator ---")
-    
-    # Telegram Mock
-    ingest_mock("tg_123", "Whale Alert", "$BTC breakdown below 40k imminent. Selling pressure from Mt. Gox wallets confirmed.")
-    
-    # Twitter Mock
-    ingest_mock("tw_finviz", "Finviz Insider", "URGENT: $AAPL supply chain issues in China reported by Nikkei. Expecting 5% downside.", source_type="twitter")
-    
-    # RSS Mock
-    ingest_mock("rss_reuters", "Reuters Business", "Fed maintains interest rates, signals no cuts until late 2026. Bullish for USD.", source_type="rss")
+
+    # One pooled client keeps the connection alive across all mock posts,
+    # and the posts themselves run concurrently.
+    limits = httpx.Limits(max_keepalive_connections=20)
+    async with httpx.AsyncClient(base_url=URL, timeout=10, limits=limits) as client:
+        await asyncio.gather(*(ingest_mock(client, *args) for args in MOCKS))
 
     print("\n--- Ingestion Complete. Check /stats or /sql for results. ---")
+
+if __name__ == "__main__":
+    asyncio.run(main())
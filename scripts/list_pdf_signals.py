@@ -1,50 +1,86 @@
-import requests
+import io
 import json
 import datetime
+import httpx
+import ijson
+
+try:
+    import orjson
+    json_loads = orjson.loads  # C parser, ~2-3x faster on big analysis blobs
+except ImportError:
+    json_loads = json.loads
 
 API_URL = "https://api.moecapital.com/sql"
+MAX_ROWS = 10
+
+class ByteStream(io.RawIOBase):
+    """File-like wrapper over a bytes iterator; ijson needs read(), a
+    plain iterable would be treated as a stream of parse events."""
+
+    def __init__(self, iterator):
+        self._iterator = iterator
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._iterator)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
 
 def get_pdf_signals():
+    # is_pdf is set at ingest time, and json_extract pulls only the
+    # analysis array server-side instead of shipping whole blobs back.
     query = {
         "sql": """
-            SELECT created_at, processed_json 
-            FROM content_items 
-            WHERE raw_text LIKE '%[PDF DOCUMENT]%' 
-              AND processed_json LIKE '%relevance_score%' 
-            ORDER BY created_at DESC 
+            SELECT created_at, json_extract(processed_json, '$.analysis') AS analysis
+            FROM content_items
+            WHERE is_pdf = 1
+              AND json_extract(processed_json, '$.analysis') IS NOT NULL
+            ORDER BY created_at DESC
             LIMIT 10
         """
     }
-    
+
     try:
-        response = requests.post(API_URL, json=query)
-        response.raise_for_status()
-        data = response.json()
-        
-        results = data.get('result', [])
-        print(f"Found {len(results)} PDF entries (Chunks/docs processed):\n")
-        
-        # Group by created_at (proxy for source calc) to verify density
+        # Stream the response and parse rows as they arrive, so peak
+        # memory is one row's analysis blob rather than the whole body.
+        found = 0
         grouped = {}
-        for item in results:
-            ts = item.get('created_at')
-            if ts not in grouped:
-                grouped[ts] = []
-            
-            try:
-                processed = json.loads(item.get('processed_json'))
-                analysis_list = processed.get('analysis', [])
-                # Handle possible nested list from previous logic or current logic
-                if isinstance(analysis_list, list):
-                   grouped[ts].extend(analysis_list)
-            except:
-                pass
+        with httpx.stream('POST', API_URL, json=query, timeout=30) as response:
+            response.raise_for_status()
+            # Group by created_at (proxy for source calc) to verify density
+            for item in ijson.items(ByteStream(response.iter_bytes()), 'result.item'):
+                found += 1
+                ts = item.get('created_at')
+                if ts not in grouped:
+                    grouped[ts] = []
+
+                try:
+                    analysis_list = json_loads(item.get('analysis'))
+                    # Handle possible nested list from previous logic or current logic
+                    if isinstance(analysis_list, list):
+                       grouped[ts].extend(analysis_list)
+                except:
+                    pass
+
+                if found >= MAX_ROWS:
+                    break
+
+        print(f"Found {found} PDF entries (Chunks/docs processed):\n")
 
         for ts, signals in grouped.items():
             dt = datetime.datetime.fromtimestamp(ts / 1000).strftime('%Y-%m-%d %H:%M:%S')
             print(f"=== Document processed at {dt} ===")
             print(f"Total Signals: {len(signals)}")
-            
+
             for signal in signals[:5]: # Show first 5 previews
                 if isinstance(signal, dict):
                     print(f"  - [{signal.get('relevance_score')}] {signal.get('summary', '')[:100]}...")
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Configuration
+LLM_PATH = os.environ.get("LLM_PATH", "llm")
+PRIMARY_MODEL = "gemini-2.5-pro"
+FALLBACK_MODEL = "gemini-2.5-flash"
+TASKS_FILE = "TASKS.md"
+MAX_ITERATIONS = 10
+HEDGE_DELAY = 5  # seconds of primary silence before the fallback also launches
+
+# Response cache: identical prompt+model within the TTL replays from disk
+# instead of re-invoking the CLI. RALPH_CACHE_MODE:
+#   enabled  - read fresh entries, write on success (default)
+#   replay   - read-only, ignore TTL, never call the CLI (CI mode)
+#   disabled - always call the CLI
+CACHE_DIR = ".ralph_cache"
+CACHE_TTL = 900  # seconds
+CACHE_MODE = os.environ.get("RALPH_CACHE_MODE", "enabled")
+
+class TokenBucket:
+    """
+    Proactive Gemini rate limiter: one bucket for requests/min, one for
+    tokens/min, refilled continuously. State persists in .ralph_cache/
+    so the budget survives the one-shot process model.
+    """
+
+    STATE_PATH = os.path.join(CACHE_DIR, "bucket.json")
+
+    def __init__(self, rpm=10, tpm=250000):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.request_tokens = float(rpm)
+        self.token_tokens = float(tpm)
+        self.last_refill = time.time()
+        # Hedged calls acquire from worker threads concurrently.
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.STATE_PATH) as f:
+                state = json.load(f)
+            self.request_tokens = min(float(state["request_tokens"]), self.rpm)
+            self.token_tokens = min(float(state["token_tokens"]), self.tpm)
+            self.last_refill = float(state["last_refill"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{self.STATE_PATH}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "request_tokens": self.request_tokens,
+                "token_tokens": self.token_tokens,
+                "last_refill": self.last_refill,
+            }, f)
+        os.replace(tmp, self.STATE_PATH)
+
+    def _refill(self):
+        now = time.time()
+        elapsed = now - self.last_refill
+        self.request_tokens = min(self.rpm, self.request_tokens + elapsed * self.rpm / 60)
+        self.token_tokens = min(self.tpm, self.token_tokens + elapsed * self.tpm / 60)
+        self.last_refill = now
+
+    def acquire(self, estimated_tokens):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.request_tokens >= 1 and self.token_tokens >= estimated_tokens:
+                    self.request_tokens -= 1
+                    self.token_tokens -= estimated_tokens
+                    self._save()
+                    return
+                wait_request = (1 - self.request_tokens) * 60 / self.rpm
+                wait_tokens = (estimated_tokens - self.token_tokens) * 60 / self.tpm
+                wait_time = max(wait_request, wait_tokens, 0.1)
+            # Sleep outside the lock so a sibling can acquire meanwhile.
+            print(f"[ralph] rate limit: sleeping {wait_time:.1f}s")
+            time.sleep(wait_time)
+
+bucket = TokenBucket(
+    rpm=int(os.environ.get("RALPH_RPM", "10")),
+    tpm=int(os.environ.get("RALPH_TPM", "250000")),
+)
+
+async def run_command(argv):
+    proc = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        out, err = await proc.communicate()
+    except asyncio.CancelledError:
+        # A cancelled hedge must not leave its CLI call burning quota.
+        proc.kill()
+        await proc.wait()
+        raise
+    return {"stdout": out.decode(), "stderr": err.decode(), "code": proc.returncode}
+
+def cache_key(prompt, model):
+    # blake2b hashes large prompts ~2x faster than SHA256; 128 bits is
+    # plenty for a local, non-adversarial cache key.
+    return hashlib.blake2b(f"{prompt}|{model}".encode(), digest_size=16).hexdigest()
+
+def cache_read(key):
+    if CACHE_MODE == "disabled":
+        return None
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    try:
+        if CACHE_MODE == "enabled" and time.time() - os.path.getmtime(path) > CACHE_TTL:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def cache_write(key, result):
+    if CACHE_MODE != "enabled":
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"{key}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp, path)  # atomic: readers never see a partial entry
+
+async def call_llm(prompt, model=PRIMARY_MODEL):
+    key = cache_key(prompt, model)
+    cached = cache_read(key)
+    if cached is not None:
+        print(f"[ralph] cache hit for {model} ({key[:12]})")
+        return cached
+    if CACHE_MODE == "replay":
+        return {"stdout": "", "stderr": "cache miss in replay mode", "code": 1, "ts": time.time()}
+
+    # acquire may sleep; run it off-loop so a hedged sibling keeps going
+    await asyncio.to_thread(bucket.acquire, len(prompt) // 4)
+    result = await run_command([LLM_PATH, "-m", model, prompt])
+    result["ts"] = time.time()
+    if result["code"] == 0:
+        cache_write(key, result)
+    return result
+
+async def call_llm_hedged(prompt):
+    """
+    Hedged request: start the primary, and if it is still running after
+    HEDGE_DELAY, race the fallback against it. First success wins and
+    the loser is cancelled.
+    """
+    primary = asyncio.create_task(call_llm(prompt, PRIMARY_MODEL))
+    done, _ = await asyncio.wait({primary}, timeout=HEDGE_DELAY)
+
+    if primary in done:
+        result = _task_result(primary)
+        if result["code"] == 0:
+            return result
+        print(f"Primary model failed: {result['stderr'][:200]}")
+        try:
+            return await call_llm(prompt, FALLBACK_MODEL)
+        except OSError as e:
+            return {"stdout": "", "stderr": repr(e), "code": 1, "ts": time.time()}
+
+    print(f"[ralph] primary slow (> {HEDGE_DELAY}s); hedging with {FALLBACK_MODEL}")
+    fallback = asyncio.create_task(call_llm(prompt, FALLBACK_MODEL))
+    pending = {primary, fallback}
+    result = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            result = _task_result(task)
+            if result["code"] == 0:
+                for p in pending:
+                    p.cancel()
+                return result
+    return result  # both failed; surface the last error
+
+def _task_result(task):
+    # A raising task (e.g. LLM_PATH missing) becomes a failed result so
+    # the hedge loop keeps driving its sibling instead of orphaning it.
+    exc = task.exception()
+    if exc is not None:
+        return {"stdout": "", "stderr": repr(exc), "code": 1, "ts": time.time()}
+    return task.result()
+
+def snapshot_tree(root=".", limit=50, skip={"node_modules", ".git", ".ralph_venv", ".ralph_cache"}):
+    # Iterative walk that prunes skipped dirs and stops at the entry
+    # limit, so we never read more of the tree than the prompt shows.
+    paths = []
+    stack = [root]
+    while stack and len(paths) < limit:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name in skip:
+                    continue
+                paths.append(os.path.relpath(entry.path, root))
+                if len(paths) >= limit:
+                    break
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+    return "\n".join(paths)
+
+def open_tasks():
+    # Line-by-line scan: no full-file string build, and only the
+    # unchecked items end up in the prompt. TASKS.md nests sub-tasks
+    # under indented checkboxes, so match after stripping the indent but
+    # keep the original line for the prompt.
+    unchecked = []
+    with open(TASKS_FILE) as f:
+        for line in f:
+            if line.lstrip().startswith("- [ ]"):
+                unchecked.append(line.rstrip())
+    return unchecked
+
+def build_prompt(tasks, tree):
+    return (
+        "You are Ralph, the autonomous maintainer of the Content Refinery.\n"
+        "Pick exactly ONE task below, do it, tick its box in TASKS.md, then stop.\n\n"
+        f"# Open tasks (from TASKS.md)\n{tasks}\n\n"
+        f"# File tree\n{tree}\n"
+    )
+
+async def main():
+    print("--- Ralph Driver ---")
+    for i in range(MAX_ITERATIONS):
+        unchecked = open_tasks()
+        if not unchecked:
+            print("All tasks complete.")
+            return
+
+        prompt = build_prompt("\n".join(unchecked), snapshot_tree())
+        result = await call_llm_hedged(prompt)
+        if result["code"] != 0:
+            print(f"Both models failed, aborting iteration {i}: {result['stderr'][:200]}")
+            return
+
+        print(result["stdout"])
+        await asyncio.sleep(2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
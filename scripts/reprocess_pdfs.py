@@ -1,42 +1,64 @@
-import requests
-import json
-import time
+import asyncio
+import httpx
 
 API_URL = "https://api.moecapital.com"
 
-# 1. Find the PDFs
-query = {
-    "sql": "SELECT id, source_name, created_at FROM content_items WHERE raw_text LIKE '%[PDF DOCUMENT]%' ORDER BY created_at DESC LIMIT 10"
-}
-
-try:
-    print("Finding PDFs...")
-    response = requests.post(f"{API_URL}/sql", json=query)
-    response.raise_for_status()
-    items = response.json().get('result', [])
-    
-    if not items:
-        print("No PDFs found to reprocess.")
-        exit()
-
-    pdf_ids = [item['id'] for item in items]
-    print(f"Found {len(pdf_ids)} PDFs to reprocess:")
-    for item in items:
-        print(f"- {item['source_name']} (ID: {item['id']})")
-
-    # 2. Trigger Reprocessing
-    print("\nTriggering reprocessing...")
-    payload = {"sourceIds": pdf_ids}
-    
-    # Note: Depending on timeout limits of Cloudflare, processing multiple large PDFs might time out. 
-    # But ContentDO handles specific list processing.
-    digest_response = requests.post(f"{API_URL}/admin/digest", json=payload)
-    
-    if digest_response.status_code == 200:
-        print("Reprocessing started successfully.")
-        print(json.dumps(digest_response.json(), indent=2))
-    else:
-        print(f"Reprocessing failed: {digest_response.text}")
-
-except Exception as e:
-    print(f"Error: {e}")
+# Cloudflare gives a worker ~30s; one digest call with every PDF risks
+# hitting it. Small chunks fired concurrently keep each request short.
+CHUNK_SIZE = 3
+MAX_CONCURRENT = 4
+
+async def post_chunk(client, sem, ids):
+    async with sem:
+        try:
+            response = await client.post(f"{API_URL}/admin/digest", json={"sourceIds": ids}, timeout=60)
+            return ids, response.status_code, response.text
+        except Exception as e:
+            return ids, None, str(e)
+
+async def main():
+    # 1. Find the PDFs
+    query = {
+        "sql": "SELECT id, source_name, created_at FROM content_items WHERE raw_text LIKE '%[PDF DOCUMENT]%' ORDER BY created_at DESC LIMIT 10"
+    }
+
+    async with httpx.AsyncClient() as client:
+        print("Finding PDFs...")
+        response = await client.post(f"{API_URL}/sql", json=query)
+        response.raise_for_status()
+        items = response.json().get('result', [])
+
+        if not items:
+            print("No PDFs found to reprocess.")
+            return
+
+        pdf_ids = [item['id'] for item in items]
+        print(f"Found {len(pdf_ids)} PDFs to reprocess:")
+        for item in items:
+            print(f"- {item['source_name']} (ID: {item['id']})")
+
+        # 2. Trigger Reprocessing in parallel chunks
+        chunks = [pdf_ids[i:i + CHUNK_SIZE] for i in range(0, len(pdf_ids), CHUNK_SIZE)]
+        print(f"\nTriggering reprocessing in {len(chunks)} chunks of up to {CHUNK_SIZE}...")
+
+        sem = asyncio.Semaphore(MAX_CONCURRENT)
+        results = await asyncio.gather(*(post_chunk(client, sem, chunk) for chunk in chunks))
+
+        failed = 0
+        for ids, status, body in results:
+            if status == 200:
+                print(f"Chunk {ids}: OK")
+            else:
+                failed += 1
+                print(f"Chunk {ids}: FAILED ({status}): {body[:200]}")
+
+        if failed:
+            print(f"\n{failed}/{len(chunks)} chunks failed.")
+        else:
+            print("\nReprocessing started successfully.")
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"Error: {e}")
@@ -58,7 +58,8 @@ export class ContentDO extends DurableObject<Env> {
                 raw_text TEXT, 
                 content_hash TEXT, 
                 created_at INTEGER, 
-                is_signal INTEGER DEFAULT 0, 
+                is_signal INTEGER DEFAULT 0,
+                is_pdf INTEGER DEFAULT 0,
                 processed_json JSON, 
                 sentiment TEXT, 
                 tags TEXT, 
@@ -71,5 +72,13 @@ export class ContentDO extends DurableObject<Env> {
             CREATE TABLE IF NOT EXISTS internal_errors (id TEXT PRIMARY KEY, module TEXT, message TEXT, context TEXT, created_at INTEGER);
             CREATE INDEX IF NOT EXISTS idx_internal_errors_created_at ON internal_errors(created_at);
         `);
+
+        // Tables created before V3.1 lack is_pdf; ALTER throws if it already exists.
+        try {
+            this.ctx.storage.sql.exec('ALTER TABLE content_items ADD COLUMN is_pdf INTEGER DEFAULT 0');
+            // Backfill rows ingested before the column existed (runs once, with the ALTER).
+            this.ctx.storage.sql.exec("UPDATE content_items SET is_pdf = 1 WHERE raw_text LIKE '%[PDF DOCUMENT]%'");
+        } catch (e) { /* column already present */ }
+        this.ctx.storage.sql.exec('CREATE INDEX IF NOT EXISTS idx_is_pdf ON content_items(is_pdf)');
     }
 }
@@ -24,13 +24,13 @@ export class FactStore {
 
         this.storage.sql.exec(`
             INSERT OR REPLACE INTO content_items (
-                id, source_id, source_name, raw_text, processed_json, 
-                is_signal, created_at, content_hash
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        `, 
+                id, source_id, source_name, raw_text, processed_json,
+                is_signal, is_pdf, created_at, content_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        `,
             item.id, item.source_id || null, item.source_name || null, item.raw_text || '',
             item.processed_json ? JSON.stringify(item.processed_json) : null,
-            item.is_signal || 0, item.created_at || Date.now(), item.metadata?.content_hash || null
+            item.is_signal || 0, item.is_pdf || 0, item.created_at || Date.now(), item.metadata?.content_hash || null
         );
 
         if (!existing) {
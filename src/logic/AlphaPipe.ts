@@ -29,13 +29,15 @@ export class AlphaPipe {
 
         const id = crypto.randomUUID();
         const sourceId = JSON.stringify({ chatId: body.chatId, messageId: body.messageId });
-        
+        const isPdf = text.includes('[PDF DOCUMENT]') ? 1 : 0;
+
         // Save raw item
         await this.store.saveContentItem({
             id,
             source_id: sourceId,
             source_name: body.title || 'Unknown',
             raw_text: text,
+            is_pdf: isPdf,
             metadata: { content_hash: contentHash }
         });
 
@@ -52,7 +54,8 @@ export class AlphaPipe {
                             source_name: "Alpha Pipe Analysis",
                             raw_text: sig.analysis,
                             processed_json: sig,
-                            is_signal: 1
+                            is_signal: 1,
+                            is_pdf: isPdf
                         });
 
                         if (Number(sig.relevance_score) >= 80) {
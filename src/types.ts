@@ -24,6 +24,7 @@ export interface ContentItem {
     raw_text: string;
     processed_json?: Signal | null;
     is_signal: number;
+    is_pdf?: number;
     created_at: number;
     metadata?: {
         content_hash?: string;